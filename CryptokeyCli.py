@@ -1,20 +1,17 @@
 import click
-from pathlib import Path
 import tomli
 import sys
 
 from src.cryptokey import Cryptokey
 
 def validate_input_extension(ctx, param, value):
-    path = Path(value)
-    if not path.suffix == ".esc" or not path.name.endswith(".ac.esc"):
+    if not value.endswith(".ac.esc"):
         raise click.BadParameter("Input file must have a `.ac.esc` extension and contain valid TOML.")
     return value
 
 
 def validate_output_extension(ctx, param, value):
-    path = Path(value)
-    if not path.suffix == ".es" or not path.name.endswith(".ac.es"):
+    if not value.endswith(".ac.es"):
         raise click.BadParameter("Output file must have a `.ac.es` extension.")
     return value
 
@@ -52,10 +49,10 @@ def cli(input, output, password, gen_pass):
     """
     # Step 1: Read and validate TOML content
     try:
-        with open(input, "r", encoding="utf-8") as f:
+        with open(input, "rb") as f:
             toml_code = f.read()
-            tomli.loads(toml_code)  # Validation only
-    except (OSError, tomli.TOMLDecodeError) as e:
+        tomli.loads(toml_code.decode("utf-8"))  # Validation only
+    except (OSError, UnicodeDecodeError, tomli.TOMLDecodeError) as e:
         click.secho("Error: Failed to read or parse the input file. Make sure it contains valid TOML.", fg="red")
         click.echo(f"Details: {str(e)}")
         sys.exit(1)
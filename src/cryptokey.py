@@ -1,7 +1,33 @@
-from src.lib.encryption import SLE
-import random
+from src.encryption import SLE
+from typing import List, Tuple, Union
+import os
+import secrets
 import string
 
+_CHARS_NOSPEC = string.ascii_letters + string.digits
+_CHARS = _CHARS_NOSPEC + "!@#$%^&*()-_=+[]{}|;:,.<>?/"
+
+
+def _sampling_table(chars: str) -> Tuple[bytes, bytes]:
+  """
+  Build a `bytes.translate` table mapping random bytes onto `chars`.
+
+  Bytes at or above the largest multiple of len(chars) are deleted rather
+  than wrapped, so every character stays equally likely.
+
+  Args:
+      chars (str): ASCII character set to sample from.
+
+  Returns:
+      tuple: (translation table, bytes to delete).
+  """
+  limit = 256 - 256 % len(chars)
+  table = bytes(ord(chars[b % len(chars)]) if b < limit else 0 for b in range(256))
+  return table, bytes(range(limit, 256))
+
+
+_TABLES = {True: _sampling_table(_CHARS), False: _sampling_table(_CHARS_NOSPEC)}
+
 
 class Cryptokey:
   """
@@ -9,13 +35,13 @@ class Cryptokey:
   and generating secure random passwords if needed.
   """
 
-  def __init__(self, password: str, toml_code: str, file_name: str):
+  def __init__(self, password: str, toml_code: Union[str, bytes], file_name: str):
     """
     Initialize the Cryptokey encryption handler.
 
     Args:
         password (str): Password used to encrypt the content.
-        toml_code (str): Raw TOML string to encrypt.
+        toml_code (str or bytes): Raw TOML to encrypt, as text or UTF-8 bytes.
         file_name (str): Output file name for encrypted data.
     """
     self.password = password
@@ -27,7 +53,10 @@ class Cryptokey:
     """
     Encrypt the TOML code and save it to the specified file.
     """
-    self.sle.generate_file(self.file_name, self.toml_code.encode())
+    data = self.toml_code
+    if isinstance(data, str):
+        data = data.encode()
+    self.sle.generate_file(self.file_name, data)
 
   def generate_password(self, length: int = 16, include_special: bool = True) -> str:
     """
@@ -40,9 +69,39 @@ class Cryptokey:
     Returns:
         str: The generated password.
     """
-    chars = string.ascii_letters + string.digits
-    if include_special:
-        chars += "!@#$%^&*()-_=+[]{}|;:,.<>?/"
+    chars = _CHARS if include_special else _CHARS_NOSPEC
+    return ''.join(secrets.choice(chars) for _ in range(length))
+
+  def generate_passwords(self, count: int, length: int = 16, include_special: bool = True) -> List[str]:
+    """
+    Generate several secure random passwords at once.
+
+    Random bytes are drawn from `os.urandom` in bulk and mapped onto the
+    character set with rejection sampling, keeping the per-character loop
+    out of the interpreter.
+
+    Args:
+        count (int): Number of passwords to generate.
+        length (int): Desired length of each password.
+        include_special (bool): Whether to include special characters.
+
+    Returns:
+        list: The generated passwords.
+
+    Raises:
+        ValueError: If `count` or `length` is negative.
+    """
+    if count < 0 or length < 0:
+        raise ValueError("Count and length must be non-negative.")
+    if length == 0:
+        return [""] * count
+
+    table, delete = _TABLES[bool(include_special)]
+    needed = count * length
+    pool = b""
+    while len(pool) < needed:
+        # Over-draw to cover rejected bytes (about 30% with special characters).
+        pool += os.urandom((needed - len(pool)) * 3 // 2 + 16).translate(table, delete)
 
-    password = ''.join(random.choices(chars, k=length))
-    return password
+    text = pool[:needed].decode("ascii")
+    return [text[i:i + length] for i in range(0, needed, length)]
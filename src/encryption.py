@@ -1,36 +1,155 @@
 import os
+import struct
+from typing import BinaryIO, Iterator, Tuple, Union
 from cryptography.hazmat.primitives import hashes, padding
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+from cryptography.exceptions import InvalidTag
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
 MAGIC_HEADER = b"__SLE__"
+# Format history:
+#   0 - no header: salt + IV + AES-CBC(MAGIC_HEADER + data), PBKDF2 with LEGACY_ITERATIONS.
+#   1 - header + salt + nonce + AES-GCM, PBKDF2 with the iteration count in the header.
+#   2 - header + salt + nonce + AES-GCM, scrypt with n, r, p in the header.
+LEGACY_FORMAT_VERSION = 0
+PBKDF2_FORMAT_VERSION = 1
+FORMAT_VERSION = 2
+DEFAULT_ITERATIONS = 600_000
+LEGACY_ITERATIONS = 100_000
+# Upper bound on PBKDF2 iterations, so a crafted header cannot stall decryption.
+MAX_ITERATIONS = 10_000_000
+SCRYPT_N = 2 ** 15
+SCRYPT_R = 8
+SCRYPT_P = 1
+# Upper bounds on scrypt parameters read from a header. A derivation needs
+# 128 * n * r bytes of memory and time proportional to n * r * p; both are
+# held to 8x the defaults so a crafted header costs at most about a second.
+MAX_SCRYPT_N = 2 ** 17
+MAX_SCRYPT_R = 16
+MAX_SCRYPT_P = 4
+MAX_SCRYPT_MEMORY = 256 * 1024 * 1024
+MAX_SCRYPT_WORK = 8 * SCRYPT_N * SCRYPT_R * SCRYPT_P
+
+# File header following MAGIC_HEADER: a format version byte, then the KDF
+# parameters for that version (PBKDF2 iteration count, or scrypt n, r, p).
+_VERSION = struct.Struct("<B")
+_PBKDF2_PARAMS = struct.Struct("<I")
+_SCRYPT_PARAMS = struct.Struct("<III")
+_KDF_PARAMS = {
+    PBKDF2_FORMAT_VERSION: _PBKDF2_PARAMS,
+    FORMAT_VERSION: _SCRYPT_PARAMS,
+}
+
+# Plaintext is fed to the cipher in chunks of this size when writing files.
+_CHUNK_SIZE = 64 * 1024
+# Output buffer for generate_file, large enough to coalesce several chunks per write().
+_WRITE_BUFFER_SIZE = 128 * 1024
+# Number of derived keys an SLE instance keeps for repeated decryption.
+_KEY_CACHE_SIZE = 8
+
+
+def _derive_pbkdf2_key(password: bytes, salt: bytes, iterations: int) -> bytes:
+    """
+    Run PBKDF2-HMAC-SHA256.
+
+    Args:
+        password (bytes): The password to derive from.
+        salt (bytes): A 16-byte salt for KDF.
+        iterations (int): Number of PBKDF2 iterations.
+
+    Returns:
+        bytes: A 32-byte AES key.
+    """
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        iterations=iterations,
+    )
+    return kdf.derive(password)
+
+
+def _derive_scrypt_key(password: bytes, salt: bytes, n: int, r: int, p: int) -> bytes:
+    """
+    Run scrypt.
+
+    Args:
+        password (bytes): The password to derive from.
+        salt (bytes): A 16-byte salt for KDF.
+        n (int): CPU/memory cost parameter, a power of two.
+        r (int): Block size parameter.
+        p (int): Parallelization parameter.
+
+    Returns:
+        bytes: A 32-byte AES key.
+    """
+    return Scrypt(salt=salt, length=32, n=n, r=r, p=p).derive(password)
+
+
+def _valid_scrypt_params(n: int, r: int, p: int) -> bool:
+    """
+    Check scrypt parameters against the supported limits.
+
+    Args:
+        n (int): CPU/memory cost parameter, a power of two.
+        r (int): Block size parameter.
+        p (int): Parallelization parameter.
+
+    Returns:
+        bool: True if the parameters are within bounds.
+    """
+    return (
+        2 <= n <= MAX_SCRYPT_N
+        and n & (n - 1) == 0
+        and 1 <= r <= MAX_SCRYPT_R
+        and 1 <= p <= MAX_SCRYPT_P
+        and 128 * n * r <= MAX_SCRYPT_MEMORY
+        and n * r * p <= MAX_SCRYPT_WORK
+    )
 
 
 class SLE:
     """
     Secure Lightweight Encryption (SLE) utility for encrypting and decrypting binary data
-    using password-based AES encryption with PBKDF2 and CBC mode.
+    using password-based AES encryption with scrypt (or PBKDF2) and GCM mode.
     """
 
-    def __init__(self, password: bytes):
+    # Padding scheme for the legacy CBC layout, shared by every decryption.
+    _PKCS7 = padding.PKCS7(128)
+
+    def __init__(self, password: bytes, iterations: int = DEFAULT_ITERATIONS, kdf: str = "scrypt"):
         """
         Initialize the encryption engine.
 
         Args:
             password (bytes): The password used for encryption and decryption.
+            iterations (int): PBKDF2 iteration count used for new encryptions
+                when `kdf` is "pbkdf2".
+            kdf (str): Key derivation function for new encryptions, either
+                "scrypt" or "pbkdf2". Decryption always uses the function and
+                parameters stored in the file header.
         """
         if not isinstance(password, bytes):
             raise TypeError("Password must be of type bytes.")
+        if not isinstance(iterations, int) or not 1 <= iterations <= MAX_ITERATIONS:
+            raise ValueError(f"Iterations must be an integer between 1 and {MAX_ITERATIONS}.")
+        if kdf not in ("scrypt", "pbkdf2"):
+            raise ValueError("KDF must be either 'scrypt' or 'pbkdf2'.")
         self.password = password
-        self.backend = default_backend()
+        self.iterations = iterations
+        self.kdf = kdf
+        self._key_cache = {}
 
-    def _derive_key(self, salt: bytes) -> bytes:
+    def _derive_key(self, salt: bytes, version: int, params: Tuple[int, ...]) -> bytes:
         """
         Derive a strong encryption key from the password and salt.
 
         Args:
             salt (bytes): A 16-byte salt for KDF.
+            version (int): Format version, which selects the KDF.
+            params (tuple): KDF parameters read from or written to the header.
 
         Returns:
             bytes: A 32-byte AES key.
@@ -38,42 +157,149 @@ class SLE:
         if len(salt) != 16:
             raise ValueError("Salt must be exactly 16 bytes.")
 
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100_000,
-            backend=self.backend,
-        )
-        return kdf.derive(self.password)
+        if version == FORMAT_VERSION:
+            return _derive_scrypt_key(self.password, salt, *params)
+        return _derive_pbkdf2_key(self.password, salt, *params)
 
-    def encrypt(self, data: bytes) -> bytes:
+    def _cached_key(self, salt: bytes, version: int, params: Tuple[int, ...]) -> Tuple[bytes, AESGCM]:
+        """
+        Derive the key for decryption, reusing it if this instance already
+        derived it for the same salt and parameters.
+
+        The AESGCM context is kept alongside the key, so repeated decryptions
+        of the same file also skip AES key setup.
+
+        Args:
+            salt (bytes): A 16-byte salt for KDF.
+            version (int): Format version, which selects the KDF.
+            params (tuple): KDF parameters read from the header.
+
+        Returns:
+            tuple: (32-byte AES key, AESGCM context for that key).
+        """
+        cache_key = (bytes(salt), version, params)
+        entry = self._key_cache.get(cache_key)
+        if entry is None:
+            if len(self._key_cache) >= _KEY_CACHE_SIZE:
+                del self._key_cache[next(iter(self._key_cache))]
+            key = self._derive_key(cache_key[0], version, params)
+            entry = self._key_cache[cache_key] = (key, AESGCM(key))
+        return entry
+
+    @staticmethod
+    def _parse_header(encrypted_data: bytes) -> Tuple[int, Tuple[int, ...], int]:
         """
-        Encrypt binary data using AES-256 in CBC mode.
+        Read the format version and KDF parameters from the file header.
+
+        Files written before the header was introduced carry no magic prefix
+        and were always derived with LEGACY_ITERATIONS; they are reported as
+        version 0.
 
         Args:
-            data (bytes): Raw data to encrypt.
+            encrypted_data (bytes): Encrypted binary blob.
 
         Returns:
-            bytes: Encrypted binary blob with salt and IV prepended.
+            tuple: (version, KDF parameters, offset of the salt within the blob).
+
+        Raises:
+            ValueError: If the header is truncated, the version is unknown or
+                the KDF parameters are out of range.
         """
-        salt = os.urandom(16)
-        iv = os.urandom(16)
-        key = self._derive_key(salt)
+        if not encrypted_data.startswith(MAGIC_HEADER):
+            return LEGACY_FORMAT_VERSION, (LEGACY_ITERATIONS,), 0
+
+        offset = len(MAGIC_HEADER) + _VERSION.size
+        if len(encrypted_data) < offset:
+            raise ValueError("Encrypted data is too short or corrupted.")
+
+        (version,) = _VERSION.unpack_from(encrypted_data, len(MAGIC_HEADER))
+        params_struct = _KDF_PARAMS.get(version)
+        if params_struct is None:
+            raise ValueError(f"Unsupported SLE format version: {version}.")
+        if len(encrypted_data) < offset + params_struct.size:
+            raise ValueError("Encrypted data is too short or corrupted.")
 
-        padder = padding.PKCS7(128).padder()
-        padded_data = padder.update(MAGIC_HEADER + data) + padder.finalize()
+        params = params_struct.unpack_from(encrypted_data, offset)
+        if version == PBKDF2_FORMAT_VERSION and not 1 <= params[0] <= MAX_ITERATIONS:
+            raise ValueError("Invalid PBKDF2 iteration count in header.")
+        if version == FORMAT_VERSION and not _valid_scrypt_params(*params):
+            raise ValueError("Invalid scrypt parameters in header.")
+        return version, params, offset + params_struct.size
 
-        cipher = Cipher(algorithms.AES(key), modes.CBC(iv), backend=self.backend)
-        encryptor = cipher.encryptor()
-        encrypted = encryptor.update(padded_data) + encryptor.finalize()
+    def _new_envelope(self) -> Tuple[bytes, bytes, bytes]:
+        """
+        Draw a fresh salt and nonce and derive the key for a new encryption.
+
+        Returns:
+            tuple: (prefix, key, nonce) where prefix is the header, salt and
+            nonce that precede the ciphertext and serve as associated data.
+        """
+        if self.kdf == "scrypt":
+            version, params = FORMAT_VERSION, (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+        else:
+            version, params = PBKDF2_FORMAT_VERSION, (self.iterations,)
 
-        return salt + iv + encrypted
+        rnd = os.urandom(16 + 12)
+        salt, nonce = rnd[:16], rnd[16:]
+        key = self._derive_key(salt, version, params)
+
+        header = _VERSION.pack(version) + _KDF_PARAMS[version].pack(*params)
+        prefix = MAGIC_HEADER + header + salt + nonce
+        return prefix, key, nonce
+
+    def encrypt(self, data: bytes) -> bytes:
+        """
+        Encrypt binary data using AES-256 in GCM mode.
+
+        The header, salt and nonce are authenticated as associated data, so
+        any tampering with them is detected on decryption.
+
+        Args:
+            data (bytes): Raw data to encrypt.
+
+        Returns:
+            bytes: Encrypted binary blob with header, salt and nonce prepended
+            and the GCM tag appended.
+        """
+        prefix, key, nonce = self._new_envelope()
+        return prefix + AESGCM(key).encrypt(nonce, data, prefix)
 
     def decrypt(self, encrypted_data: bytes) -> bytes:
         """
         Decrypt data previously encrypted with this class.
 
+        Args:
+            encrypted_data (bytes): Data to decrypt.
+
+        Returns:
+            bytes: Decrypted original content.
+
+        Raises:
+            ValueError: If decryption fails or data is invalid.
+        """
+        version, params, offset = self._parse_header(encrypted_data)
+        if version == LEGACY_FORMAT_VERSION:
+            return self._decrypt_legacy(encrypted_data)
+
+        data_start = offset + 16 + 12
+        if len(encrypted_data) < data_start + 16:
+            raise ValueError("Encrypted data is too short or corrupted.")
+
+        salt = encrypted_data[offset:offset + 16]
+        nonce = encrypted_data[offset + 16:data_start]
+        _, aead = self._cached_key(salt, version, params)
+
+        # Slice through a memoryview so the ciphertext is not copied before decryption.
+        view = memoryview(encrypted_data)
+        try:
+            return aead.decrypt(nonce, view[data_start:], view[:data_start])
+        except InvalidTag:
+            raise ValueError("Invalid password or data corrupted.")
+
+    def _decrypt_legacy(self, encrypted_data: bytes) -> bytes:
+        """
+        Decrypt data written in the original header-less AES-CBC layout.
+
         Args:
             encrypted_data (bytes): Data to decrypt.
 
@@ -88,15 +314,15 @@ class SLE:
 
         salt = encrypted_data[:16]
         iv = encrypted_data[16:32]
-        encrypted = encrypted_data[32:]
+        encrypted = memoryview(encrypted_data)[32:]
 
-        key = self._derive_key(salt)
-        cipher = Cipher(algorithms.AES(key), modes.CBC(iv), backend=self.backend)
+        key, _ = self._cached_key(salt, LEGACY_FORMAT_VERSION, (LEGACY_ITERATIONS,))
+        cipher = Cipher(algorithms.AES(key), modes.CBC(iv))
 
         decryptor = cipher.decryptor()
         padded_data = decryptor.update(encrypted) + decryptor.finalize()
 
-        unpadder = padding.PKCS7(128).unpadder()
+        unpadder = self._PKCS7.unpadder()
         data = unpadder.update(padded_data) + unpadder.finalize()
 
         if not data.startswith(MAGIC_HEADER):
@@ -104,17 +330,29 @@ class SLE:
 
         return data[len(MAGIC_HEADER):]
 
-    def generate_file(self, filename: str, data: bytes) -> None:
+    def generate_file(self, filename: str, data_source: Union[bytes, BinaryIO]) -> None:
         """
         Encrypt data and save it to a file.
 
+        The plaintext is encrypted chunk by chunk and written as it goes, so
+        no full-size ciphertext buffer is built. The output has the same
+        layout as encrypt().
+
         Args:
             filename (str): Destination file path.
-            data (bytes): Raw data to encrypt.
+            data_source (bytes or BinaryIO): Raw data to encrypt, or a binary
+                file object to read it from.
         """
-        encrypted = self.encrypt(data)
-        with open(filename, "wb") as f:
-            f.write(encrypted)
+        prefix, key, nonce = self._new_envelope()
+        encryptor = Cipher(algorithms.AES(key), modes.GCM(nonce)).encryptor()
+        encryptor.authenticate_additional_data(prefix)
+
+        with open(filename, "wb", buffering=_WRITE_BUFFER_SIZE) as f:
+            f.write(prefix)
+            for chunk in _iter_chunks(data_source):
+                f.write(encryptor.update(chunk))
+            f.write(encryptor.finalize())
+            f.write(encryptor.tag)
 
     def read_file(self, filename: str) -> bytes:
         """
@@ -133,6 +371,30 @@ class SLE:
             return f.read()
 
 
+def _iter_chunks(data_source: Union[bytes, BinaryIO]) -> Iterator[bytes]:
+    """
+    Yield the plaintext in _CHUNK_SIZE pieces without copying bytes input.
+
+    Args:
+        data_source (bytes or BinaryIO): Raw data or a binary file object.
+
+    Yields:
+        memoryview or bytes: Consecutive chunks of the plaintext; memoryview
+        slices for bytes-like input, bytes read from a file object otherwise.
+    """
+    if isinstance(data_source, (bytes, bytearray, memoryview)):
+        view = memoryview(data_source)
+        for start in range(0, len(view), _CHUNK_SIZE):
+            yield view[start:start + _CHUNK_SIZE]
+        return
+
+    while True:
+        chunk = data_source.read(_CHUNK_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+
 # from src.lib.encryption import SLE
 
 # password = b"mysecretpassword"
@@ -1,45 +1,52 @@
 import tomli
-from types import SimpleNamespace
 from typing import Any, Union
 
-
-def _dict_to_namespace(d: dict) -> Any:
-  """
-  Recursively converts a dictionary to a SimpleNamespace object
-  to allow dot notation access.
-
-  Args:
-      d (dict): The dictionary to convert.
-
-  Returns:
-      SimpleNamespace or value: Namespace or original value.
-  """
-  if not isinstance(d, dict):
-      return d
-  return SimpleNamespace(**{k: _dict_to_namespace(v) for k, v in d.items()})
+_SENTINEL = object()
 
 
 class TomlHandler:
   """
   Parses TOML code and provides dot-accessible attributes.
+
+  Nested tables are wrapped in their own TomlHandler on first access
+  rather than converted up front.
   """
 
-  def __init__(self, toml_code: str):
+  __slots__ = ("_raw_dict", "_ns_cache")
+
+  def __init__(self, toml_code: Union[str, dict]):
       """
-      Initialize the handler with TOML source code.
+      Initialize the handler with TOML source code or parsed TOML data.
 
       Args:
-          toml_code (str): The TOML string to parse.
+          toml_code (str or dict): The TOML string to parse, or an
+              already-parsed dictionary to wrap as-is.
 
       Raises:
           ValueError: If the TOML code is invalid.
       """
-      try:
-          self._raw_dict = tomli.loads(toml_code)
-      except tomli.TOMLDecodeError as e:
-          raise ValueError(f"Invalid TOML syntax: {e}")
+      if isinstance(toml_code, dict):
+          self._raw_dict = toml_code
+      else:
+          try:
+              self._raw_dict = tomli.loads(toml_code)
+          except tomli.TOMLDecodeError as e:
+              raise ValueError(f"Invalid TOML syntax: {e}")
+
+      self._ns_cache = {}
+
+  @classmethod
+  def from_dict(cls, data: dict) -> "TomlHandler":
+    """
+    Build a handler from TOML data that has already been parsed.
 
-      self._data = _dict_to_namespace(self._raw_dict)
+    Args:
+        data (dict): Parsed TOML data, e.g. the result of `tomli.loads`.
+
+    Returns:
+        TomlHandler: Handler wrapping the given data without re-parsing it.
+    """
+    return cls(data)
 
   def __getattr__(self, item: str) -> Any:
     """
@@ -49,16 +56,23 @@ class TomlHandler:
         item (str): Attribute name.
 
     Returns:
-        Any: Value of the attribute.
+        Any: Value of the attribute; nested tables are returned as TomlHandler.
 
     Raises:
         AttributeError: If the attribute doesn't exist.
     """
-    try:
-        return getattr(self._data, item)
-    except AttributeError:
+    value = self._raw_dict.get(item, _SENTINEL)
+    if value is _SENTINEL:
         raise AttributeError(f"'{item}' not found in TOML data.")
 
+    if not isinstance(value, dict):
+        return value
+
+    handler = self._ns_cache.get(item)
+    if handler is None:
+        handler = self._ns_cache[item] = TomlHandler(value)
+    return handler
+
   def as_dict(self) -> dict:
     """
     Get the original parsed data as a plain dictionary.
@@ -0,0 +1,42 @@
+import pytest
+
+from src.cryptokey import Cryptokey, _CHARS, _CHARS_NOSPEC
+
+
+@pytest.fixture
+def cryptokey():
+    return Cryptokey(password="", toml_code="", file_name="")
+
+
+def test_generate_passwords_count_and_length(cryptokey):
+    passwords = cryptokey.generate_passwords(500, 24)
+    assert len(passwords) == 500
+    assert all(len(p) == 24 for p in passwords)
+
+
+def test_generate_passwords_uses_charset(cryptokey):
+    text = "".join(cryptokey.generate_passwords(200, 50))
+    assert set(text) <= set(_CHARS)
+    # 10,000 draws from 89 characters should hit every one of them.
+    assert set(text) == set(_CHARS)
+
+
+def test_generate_passwords_without_special(cryptokey):
+    text = "".join(cryptokey.generate_passwords(200, 50, include_special=False))
+    assert set(text) <= set(_CHARS_NOSPEC)
+
+
+def test_generate_passwords_truthy_include_special(cryptokey):
+    text = "".join(cryptokey.generate_passwords(10, 10, include_special="yes"))
+    assert set(text) <= set(_CHARS)
+
+
+def test_generate_passwords_empty(cryptokey):
+    assert cryptokey.generate_passwords(0) == []
+    assert cryptokey.generate_passwords(3, 0) == ["", "", ""]
+
+
+@pytest.mark.parametrize("count, length", [(-1, 16), (2, -3)])
+def test_generate_passwords_rejects_negative(cryptokey, count, length):
+    with pytest.raises(ValueError):
+        cryptokey.generate_passwords(count, length)
@@ -0,0 +1,110 @@
+import io
+import os
+import struct
+
+import pytest
+
+from src.encryption import (
+    MAGIC_HEADER,
+    FORMAT_VERSION,
+    MAX_ITERATIONS,
+    PBKDF2_FORMAT_VERSION,
+    SLE,
+    _CHUNK_SIZE,
+)
+
+
+def _pbkdf2_blob(iterations: int) -> bytes:
+    header = MAGIC_HEADER + struct.pack("<BI", PBKDF2_FORMAT_VERSION, iterations)
+    return header + bytes(16 + 12 + 16)
+
+
+def _scrypt_blob(n: int, r: int, p: int) -> bytes:
+    header = MAGIC_HEADER + struct.pack("<BIII", FORMAT_VERSION, n, r, p)
+    return header + bytes(16 + 12 + 16)
+
+
+def test_pbkdf2_round_trip():
+    sle = SLE(b"password", iterations=1000, kdf="pbkdf2")
+    blob = sle.encrypt(b"[encryption]\nmysql = \"123123\"")
+    assert sle.decrypt(blob) == b"[encryption]\nmysql = \"123123\""
+
+
+@pytest.mark.parametrize("iterations", [0, MAX_ITERATIONS + 1, 2 ** 31, 2 ** 32 - 1])
+def test_decrypt_rejects_bad_iteration_header(iterations):
+    with pytest.raises(ValueError):
+        SLE(b"password").decrypt(_pbkdf2_blob(iterations))
+
+
+@pytest.mark.parametrize("iterations", [0, MAX_ITERATIONS + 1, 2 ** 32])
+def test_init_rejects_bad_iterations(iterations):
+    with pytest.raises(ValueError):
+        SLE(b"password", iterations=iterations, kdf="pbkdf2")
+
+
+def test_scrypt_round_trip():
+    sle = SLE(b"password")
+    assert sle.decrypt(sle.encrypt(b"secret")) == b"secret"
+
+
+@pytest.mark.parametrize(
+    "n, r, p",
+    [
+        (2 ** 24, 8, 1),
+        (2 ** 21, 8, 1),
+        (2 ** 20, 8, 16),
+        (2 ** 18, 8, 1),
+        (2 ** 17, 8, 4),
+        (3, 8, 1),
+        (0, 8, 1),
+        (2 ** 15, 0, 1),
+        (2 ** 15, 64, 1),
+        (2 ** 15, 8, 0),
+        (2 ** 15, 8, 5),
+    ],
+)
+def test_decrypt_rejects_bad_scrypt_header(n, r, p):
+    with pytest.raises(ValueError, match="scrypt parameters"):
+        SLE(b"password").decrypt(_scrypt_blob(n, r, p))
+
+
+def test_decrypt_reuses_key_per_instance():
+    sle = SLE(b"password", iterations=1000, kdf="pbkdf2")
+    blob = sle.encrypt(b"secret")
+    assert not sle._key_cache
+
+    assert sle.decrypt(blob) == b"secret"
+    assert sle.decrypt(blob) == b"secret"
+    assert len(sle._key_cache) == 1
+
+
+@pytest.mark.parametrize(
+    "data",
+    [b"", b"short", os.urandom(3 * _CHUNK_SIZE + 17)],
+    ids=["empty", "short", "multi-chunk"],
+)
+def test_generate_file_round_trip_bytes(tmp_path, data):
+    sle = SLE(b"password", iterations=1000, kdf="pbkdf2")
+    path = str(tmp_path / "out.ac.es")
+
+    sle.generate_file(path, data)
+    assert sle.decrypt(sle.read_file(path)) == data
+
+
+def test_generate_file_round_trip_stream(tmp_path):
+    sle = SLE(b"password", iterations=1000, kdf="pbkdf2")
+    path = str(tmp_path / "out.ac.es")
+    data = os.urandom(2 * _CHUNK_SIZE + 1)
+
+    sle.generate_file(path, io.BytesIO(data))
+    assert sle.decrypt(sle.read_file(path)) == data
+
+
+def test_decrypt_reuses_aead_per_instance():
+    sle = SLE(b"password", iterations=1000, kdf="pbkdf2")
+    blob = sle.encrypt(b"secret")
+    sle.decrypt(blob)
+    (entry,) = sle._key_cache.values()
+
+    assert sle.decrypt(blob) == b"secret"
+    assert next(iter(sle._key_cache.values())) is entry